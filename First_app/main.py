@@ -1,13 +1,17 @@
+import os
+import secrets
+
 import uvicorn
 from fastapi import FastAPI, Depends
 from fastapi.exceptions import HTTPException 
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
 from typing import Annotated
 
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -38,14 +42,17 @@ fake_users_db = {
     }
 }   
 
+_users_by_name = {username: UserInDb(**user_dict) for username, user_dict in fake_users_db.items()}
+
 def fake_password_hasher(password):
     return f"fakehashed{password}"
 
 def get_user(db, username):
-    if username in db:
-        user_dict = fake_users_db[username]
-        user = UserInDb(**user_dict)
-        return user     
+    # the static store is prebuilt at import time
+    if db is fake_users_db:
+        return _users_by_name.get(username)
+    user_dict = db.get(username)
+    return UserInDb.model_validate(user_dict) if user_dict else None
     
 def fake_decode_token(token):
     user = get_user(fake_users_db, token)
@@ -72,7 +79,6 @@ async def login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()]):
         raise HTTPException(status_code=400, detail= "incorrect username or password")
     hashed_password = fake_password_hasher(form_data.password)
     
-    import secrets
     #if hashed_password != user.hashed_password:
     if not secrets.compare_digest(hashed_password, user.hashed_password):
         raise HTTPException(status_code=400, detail="incorrect username or password")
@@ -83,5 +89,14 @@ async def read_users_me(user: User = Depends(get_current_active_user)):
     return user
     
 if __name__ == "__main__":
-    uvicorn.run(app, host="127.0.0.1", port=8000)
+    # workers need an import string; run from this directory
+    # loop="auto" picks uvloop where it is installed (it has no Windows build)
+    uvicorn.run(
+        "main:app",
+        host="127.0.0.1",
+        port=8000,
+        workers=(os.cpu_count() or 1) * 2 + 1,
+        loop="auto",
+        http="httptools",
+    )
 